@@ -3,9 +3,14 @@
 # Replace previous app7.py with this file.
 import streamlit as st
 import pandas as pd
+import numpy as np
+import altair as alt
 import math
 import io
 import json
+import hashlib
+import re
+from collections import deque
 
 st.set_page_config(page_title="Agent Pricing Factory", layout="wide")
 
@@ -56,6 +61,11 @@ DEFAULTS = {
     "sim_human_inloop_pct_global": 0.0,
 }
 
+# Keep TCO/Simulation inputs across pages: Streamlit drops a widget's key when its page is not
+# shown, so re-assign them every run to turn them into plain session values.
+for k in [k for k in st.session_state if k.startswith(("tco_", "sim_"))]:
+    st.session_state[k] = st.session_state[k]
+
 # Ensure session defaults
 for k, v in DEFAULTS.items():
     if k not in st.session_state:
@@ -70,6 +80,195 @@ def currency(x):
 # Shared list of agent types
 AGENT_TYPES = ["Utility", "Standard", "Professional", "Enterprise"]
 
+# -----------------------
+# Scenario inputs & batch evaluation (vectorised Simulation/TCO math)
+# -----------------------
+# Every tco_/sim_ input a scenario can carry, with the fallback each page uses when the key is missing.
+SCENARIO_DEFAULTS = dict(DEFAULTS)
+SCENARIO_DEFAULTS.update({
+    "tco_one_time_rpa_license": 0,
+    "tco_one_time_orch_license": 0,
+    "tco_one_time_analytics_license": 0,
+    "tco_one_time_other_license": 0,
+    "sim_human_inloop_pct_percent": 0,  # slider behind sim_human_inloop_pct_global
+})
+for _t in AGENT_TYPES:
+    _lower = _t.lower()
+    SCENARIO_DEFAULTS.setdefault(f"tco_build_hours_{_lower}", DEFAULTS["tco_build_hours_utility"])
+    SCENARIO_DEFAULTS.setdefault(f"tco_hourly_{_lower}", DEFAULTS["tco_hourly_utility"])
+    SCENARIO_DEFAULTS[f"tco_maint_pct_{_lower}"] = DEFAULTS["tco_maintenance_pct_year"]
+    SCENARIO_DEFAULTS[f"tco_enh_pct_{_lower}"] = DEFAULTS["tco_enhancement_pct_year"]
+    SCENARIO_DEFAULTS[f"tco_maint_per_slab_{_lower}"] = 0
+    SCENARIO_DEFAULTS[f"tco_maint_slab_{_lower}"] = DEFAULTS["tco_maint_slab_default"]
+    SCENARIO_DEFAULTS[f"tco_agent_hours_{_lower}"] = DEFAULTS["tco_agent_hours_per_month"]
+    SCENARIO_DEFAULTS[f"tco_human_pct_{_lower}"] = DEFAULTS["tco_human_inloop_pct"]
+    SCENARIO_DEFAULTS[f"tco_human_rate_{_lower}"] = DEFAULTS["tco_human_hourly_rate"]
+    SCENARIO_DEFAULTS[f"sim_agent_prodhrs_{_lower}"] = DEFAULTS["tco_agent_hours_per_month"]
+    SCENARIO_DEFAULTS[f"sim_count_{_lower}"] = 0
+
+def current_scenario_values():
+    """The session's tco_/sim_ values (kept alive across pages by the re-assignment at the top)."""
+    return {k: v for k, v in st.session_state.items() if k.startswith(("tco_", "sim_"))}
+
+def load_scenario_into_session(values):
+    """Write a scenario onto the tco_/sim_ inputs; call from a widget callback (before widgets exist)."""
+    for k, v in values.items():
+        default = SCENARIO_DEFAULTS.get(k)
+        if default is not None:
+            st.session_state[k] = int(round(v)) if isinstance(default, int) else float(v)
+
+def scenario_inputs(values):
+    """Complete a partial dict of tco_/sim_ values into a full numeric scenario (unknown keys dropped)."""
+    out = {}
+    for k, default in SCENARIO_DEFAULTS.items():
+        try:
+            out[k] = float(values.get(k, default))
+        except (TypeError, ValueError):
+            out[k] = float(default)
+    for t in AGENT_TYPES:
+        lower = t.lower()
+        # Simulation seeds agent productive hours from the TCO page when not set explicitly
+        if f"sim_agent_prodhrs_{lower}" not in values:
+            out[f"sim_agent_prodhrs_{lower}"] = out[f"tco_agent_hours_{lower}"]
+    if "sim_human_inloop_pct_percent" not in values:
+        out["sim_human_inloop_pct_percent"] = round(out["sim_human_inloop_pct_global"] * 100.0)
+    return out
+
+def simulate_batch(inputs):
+    """Evaluate TCO totals and Simulation financials for many scenarios at once.
+
+    `inputs` maps every SCENARIO_DEFAULTS key to a scalar or a 1-d array (e.g. a DataFrame of
+    scenarios); scalars broadcast. Mirrors the integer truncation/rounding of tco_page and
+    simulation_page so a single scenario reproduces what those pages display.
+    """
+    def col(k):
+        return np.asarray(inputs[k], dtype=float)
+
+    # TCO totals
+    num_agents = np.trunc(col("tco_min_agents"))
+    calls = num_agents * np.trunc(col("tco_interactions_per_agent_month"))
+    token_cost = calls * np.trunc(col("tco_avg_tokens_interaction")) * col("tco_token_price_per_1k") / 1000.0
+    runtime_call_cost = calls * col("tco_agent_runtime_cost_per_call")
+    total_infra_monthly = (token_cost + runtime_call_cost + col("tco_vector_db_monthly") + col("tco_embedding_monthly") +
+                           col("tco_logging_monthly") + col("tco_api_gateway_monthly") + col("tco_cicd_monthly") +
+                           col("tco_recurring_license_monthly"))
+    total_foundation = sum(np.trunc(col(f"tco_one_time_{k}")) for k in ("identity", "vpc", "observability", "security"))
+    total_one_time_licenses = sum(np.trunc(col(f"tco_one_time_{k}_license")) for k in ("rpa", "orch", "analytics", "other"))
+
+    # Simulation: agents
+    total_hours = col("sim_hours")
+    agent_hr_max = np.trunc(total_hours * (col("sim_agent_ratio_pct") / 100.0))
+    agent_cm_pct = col("sim_agent_cm_pct")
+    agent_trio_pct = col("sim_agent_trio_pct")
+    agent_headcount = agent_capacity_ann = agent_revenue_ann = 0.0
+    agent_dev_amort_ann = agent_maint_ann = agent_enh_ann = 0.0
+    for t in AGENT_TYPES:
+        lower = t.lower()
+        cnt = np.trunc(col(f"sim_count_{lower}"))
+        prod_hrs = np.trunc(col(f"sim_agent_prodhrs_{lower}"))
+        build_one_time = np.trunc(col(f"tco_build_hours_{lower}") * col(f"tco_hourly_{lower}"))
+        enh_yearly_total = np.trunc((col(f"tco_enh_pct_{lower}") / 100.0) * build_one_time * cnt)
+        dev_amort_month = build_one_time / 12.0
+        slabs = np.ceil(cnt / np.maximum(1, np.trunc(col(f"tco_maint_slab_{lower}"))))
+        maint_month = np.where(cnt == 0, 0.0, np.trunc(np.trunc(col(f"tco_maint_per_slab_{lower}")) * slabs))
+        monthly_base_cost = dev_amort_month + maint_month + enh_yearly_total / 12.0
+        blended_price_month = np.where(cnt == 0, 0.0,
+                                       np.round(monthly_base_cost * (1 + (agent_cm_pct - agent_trio_pct) / 100.0)))
+        agent_headcount = agent_headcount + cnt
+        agent_capacity_ann = agent_capacity_ann + np.trunc(prod_hrs * 12 * cnt)
+        agent_revenue_ann = agent_revenue_ann + blended_price_month * 12 * cnt
+        agent_dev_amort_ann = agent_dev_amort_ann + np.trunc(dev_amort_month * 12) * cnt
+        agent_maint_ann = agent_maint_ann + np.trunc(maint_month * 12)
+        agent_enh_ann = agent_enh_ann + enh_yearly_total
+    agent_direct_costs_ann = agent_dev_amort_ann + agent_maint_ann + agent_enh_ann
+
+    # Simulation: humans
+    agent_hours_ann_delivered = np.trunc(np.minimum(agent_capacity_ann, agent_hr_max))
+    human_inloop_hours = np.round(agent_hours_ann_delivered * col("sim_human_inloop_pct_global"))
+    residual_hours_ann = np.maximum(0, np.trunc(total_hours - agent_hours_ann_delivered))
+    human_hours_ann = residual_hours_ann + human_inloop_hours
+    capacity_per_person = np.trunc(np.trunc(col("sim_prod_human")) * 12)
+    human_headcount_required = np.where(capacity_per_person > 0,
+                                        np.ceil(human_hours_ann / np.maximum(capacity_per_person, 1)), 0.0)
+    human_blend_cost_hr = col("sim_human_blend_cost_hr")
+    human_trio_pct = col("sim_human_trio_pct")
+    human_cost_direct_ann = human_blend_cost_hr * human_hours_ann
+    human_price_hr = np.where(human_hours_ann == 0, 0.0,
+                              human_blend_cost_hr * (1 + np.maximum(0.0, col("sim_human_cm_pct") - human_trio_pct) / 100.0))
+    human_revenue_ann = human_price_hr * human_hours_ann
+
+    # Combined financials
+    total_revenue_ann = agent_revenue_ann + human_revenue_ann
+    total_direct_costs_ann = agent_direct_costs_ann + human_cost_direct_ann
+    total_contribution_financial = total_revenue_ann - total_direct_costs_ann
+    total_trio_financial = agent_revenue_ann * (agent_trio_pct / 100.0) + human_revenue_ann * (human_trio_pct / 100.0)
+    total_gop_financial = total_contribution_financial - total_trio_financial
+    safe_revenue = np.where(total_revenue_ann > 0, total_revenue_ann, 1.0)
+    true_cm_pct = np.where(total_revenue_ann > 0, total_contribution_financial / safe_revenue * 100.0, 0.0)
+    true_gop_pct = np.where(total_revenue_ann > 0, total_gop_financial / safe_revenue * 100.0, 0.0)
+
+    out = {
+        "total_foundation": total_foundation,
+        "total_infra_monthly": total_infra_monthly,
+        "total_one_time_licenses": total_one_time_licenses,
+        "agent_headcount": agent_headcount,
+        "agent_capacity_ann": agent_capacity_ann,
+        "agent_hours_ann_delivered": agent_hours_ann_delivered,
+        "human_hours_ann": human_hours_ann,
+        "human_headcount_required": human_headcount_required,
+        "agent_revenue_ann": agent_revenue_ann,
+        "human_revenue_ann": human_revenue_ann,
+        "total_revenue_ann": total_revenue_ann,
+        "agent_direct_costs_ann": agent_direct_costs_ann,
+        "human_cost_direct_ann": human_cost_direct_ann,
+        "total_direct_costs_ann": total_direct_costs_ann,
+        "total_contribution_financial": total_contribution_financial,
+        "total_gop_financial": total_gop_financial,
+        "true_cm_pct": true_cm_pct,
+        "true_gop_pct": true_gop_pct,
+    }
+    shape = np.broadcast_shapes(*(np.shape(v) for v in out.values()))
+    return {k: np.broadcast_to(v, shape) for k, v in out.items()}
+
+def pareto_front_mask(levels, cost, loss):
+    """Boolean mask of the non-dominated points when minimising (levels, cost, loss).
+
+    `levels` must be discrete (e.g. a headcount). Points are lexsorted once and swept level by
+    level: a running minimum finds each level's own 2-D (cost, loss) frontier, and searchsorted
+    checks it against the staircase of everything on lower levels, so the cost is O(n log n).
+    Identical objective vectors do not dominate each other and share one status.
+    """
+    levels, cost, loss = (np.asarray(a, dtype=float).ravel() for a in (levels, cost, loss))
+    mask = np.zeros(len(cost), dtype=bool)
+    if len(cost) == 0:
+        return mask
+    order = np.lexsort((loss, cost, levels))
+    lv, c, g = levels[order], cost[order], loss[order]
+    new_point = np.ones(len(c), dtype=bool)
+    new_point[1:] = (lv[1:] != lv[:-1]) | (c[1:] != c[:-1]) | (g[1:] != g[:-1])
+    uniq = np.flatnonzero(new_point)
+    lv, c, g = lv[uniq], c[uniq], g[uniq]
+
+    front = np.zeros(len(uniq), dtype=bool)
+    stair_c = stair_g = np.empty(0)  # lower-level frontier: cost ascending, loss strictly descending
+    bounds = np.flatnonzero(np.r_[True, lv[1:] != lv[:-1], True])
+    for a, b in zip(bounds[:-1], bounds[1:]):
+        cs, gs = c[a:b], g[a:b]
+        best_before = np.r_[np.inf, np.minimum.accumulate(gs)[:-1]]
+        ok = best_before > gs
+        if stair_c.size:
+            k = np.searchsorted(stair_c, cs, side="right") - 1
+            ok &= ~((k >= 0) & (stair_g[np.maximum(k, 0)] <= gs))
+        front[a:b] = ok
+        merged_c, merged_g = np.r_[stair_c, cs[ok]], np.r_[stair_g, gs[ok]]
+        m = np.lexsort((merged_g, merged_c))
+        merged_c, merged_g = merged_c[m], merged_g[m]
+        keep = np.r_[np.inf, np.minimum.accumulate(merged_g)[:-1]] > merged_g
+        stair_c, stair_g = merged_c[keep], merged_g[keep]
+
+    mask[order] = front[np.cumsum(new_point) - 1]
+    return mask
+
 # -----------------------
 # TCO page (same as app7 but minimal repeated code removed)
 # -----------------------
@@ -265,17 +464,30 @@ def tco_page():
         st.download_button("Download TCO JSON", data=prof_json.encode("utf-8"), file_name="tco_profile.json", mime="application/json")
     except Exception:
         st.info("Unable to prepare TCO JSON export.")
-    uploaded = st.file_uploader("Upload TCO JSON to load (will overwrite tco_ session keys)", type=["json"])
-    if uploaded:
-        try:
-            loaded = json.load(uploaded)
-            for k, v in loaded.items():
-                if k.startswith("tco_"):
-                    st.session_state[k] = v
-            st.success("TCO profile loaded into session. Page will reflect new values.")
-            st.experimental_rerun()
-        except Exception as e:
-            st.error(f"Failed to load JSON: {e}")
+    st.file_uploader("Upload TCO JSON to load (will overwrite tco_ session keys)", type=["json"],
+                     key="upload_tco_json", on_change=_load_tco_json)
+    if "upload_tco_json_msg" in st.session_state:
+        level, msg = st.session_state.pop("upload_tco_json_msg")
+        getattr(st, level)(msg)
+
+def _load_tco_json():
+    """Uploader callback: load a TCO profile as one undoable step, checkpointing the previous values."""
+    uploaded = st.session_state.get("upload_tco_json")
+    if uploaded is None:
+        return
+    try:
+        loaded = json.load(uploaded)
+        if not isinstance(loaded, dict):
+            raise ValueError("expected a JSON object")
+    except Exception as e:
+        st.session_state["upload_tco_json_msg"] = ("error", f"Failed to load JSON: {e}")
+        return
+    values = {k: v for k, v in loaded.items() if k.startswith("tco_") and isinstance(v, (int, float, str, bool))}
+    if any(st.session_state.get(k) != v for k, v in values.items()):
+        save_checkpoint("Before TCO JSON load")
+    apply_as_history_step(values)
+    st.session_state["upload_tco_json_msg"] = ("success", f"TCO profile '{uploaded.name}' loaded ({len(values)} values). "
+                                                   "Undo or the 'Before TCO JSON load' checkpoint restores the previous values.")
 
 # -----------------------
 # Simulation page (keep app7 logic)
@@ -723,6 +935,372 @@ def models_page():
         st.markdown(f"- Human cost (ann): **{currency(human_cost_ann)}**")
         st.markdown(f"- Combined cost (ann): **{currency(total_agent_cost_ann + human_cost_ann)}**")
 
+# -----------------------
+# Compare page (many scenarios side by side)
+# -----------------------
+COMPARE_STYLE_MAX_CELLS = 10000  # cells per styled page; pandas Styler cost grows per cell
+
+def _style_deltas(table, deltas, output_cols):
+    """Cell styles for the comparison table: changed inputs in amber, outputs green (up) / red (down)."""
+    styles = np.where(deltas.to_numpy() != 0, "background-color: #fff3cd", "")
+    is_output = np.isin(table.columns, output_cols)
+    styles[:, is_output] = np.where(deltas.to_numpy()[:, is_output] > 0, "background-color: #d1fae5",
+                                    np.where(deltas.to_numpy()[:, is_output] < 0, "background-color: #fee2e2", ""))
+    return pd.DataFrame(styles, index=table.index, columns=table.columns)
+
+# Rate-card workbook columns -> TCO input prefix (headers are matched case/punctuation-insensitively)
+RATE_CARD_COLUMNS = {
+    "agent_type": ["agent type", "agent", "type"],
+    "variant": ["variant", "scenario", "rate card"],
+    "tco_build_hours_": ["build hours", "build effort", "build effort hours"],
+    "tco_hourly_": ["hourly rate", "hourly rate sek hr", "build rate"],
+    "tco_maint_pct_": ["maintenance", "maint", "maintenance pct", "maint pct", "maintenance of build per year"],
+    "tco_human_rate_": ["human rate", "human hourly rate", "human hourly rate sek hr"],
+}
+
+def _normalise_header(value):
+    return re.sub(r"[^a-z0-9]+", " ", str(value or "").lower()).strip()
+
+def read_rate_cards(data):
+    """Stream rate-card rows out of an .xlsx workbook (read-only mode, one row at a time).
+
+    Each sheet needs a header row with an agent type column plus any of build hours, hourly rate,
+    maintenance % and human rate. Rows are grouped into variants by the optional variant column,
+    otherwise by sheet name. Maintenance cells formatted as a percentage in Excel (stored as 0.2
+    for 20%) are scaled to percent; unformatted fractions below 1 are rejected as ambiguous.
+    Returns (variants, errors, skipped_sheets) where variants maps a variant name to the tco_
+    overrides it carries.
+    """
+    import openpyxl
+
+    aliases = {alias: field for field, names in RATE_CARD_COLUMNS.items() for alias in names}
+    known_types = {t.lower() for t in AGENT_TYPES}
+    variants, errors, skipped = {}, [], []
+    seen = {}  # (variant, agent type) -> "sheet row n" of its first row
+    wb = openpyxl.load_workbook(io.BytesIO(data), read_only=True, data_only=True)
+    try:
+        for ws in wb.worksheets:
+            columns = None
+            for row_no, row_cells in enumerate(ws.iter_rows(), start=1):
+                row = [cell.value for cell in row_cells]
+                if not any(cell is not None and str(cell).strip() for cell in row):
+                    continue
+                if columns is None:
+                    # first non-empty row is the header
+                    columns = {i: aliases[_normalise_header(c)] for i, c in enumerate(row) if _normalise_header(c) in aliases}
+                    if "agent_type" not in columns.values():
+                        break
+                    continue
+                cells = {field: row[i] for i, field in columns.items() if i < len(row)}
+                formats = {field: str(getattr(row_cells[i], "number_format", None) or "")
+                           for i, field in columns.items() if i < len(row)}
+                agent_type = str(cells.get("agent_type") or "").strip().lower()
+                if agent_type not in known_types:
+                    errors.append(f"{ws.title} row {row_no}: unknown agent type '{cells.get('agent_type')}'")
+                    continue
+                row_values, row_errors = {}, []
+                for field, value in cells.items():
+                    if not field.startswith("tco_") or value is None or value == "":
+                        continue
+                    try:
+                        number = float(value)
+                    except (TypeError, ValueError):
+                        row_errors.append(f"{ws.title} row {row_no}: '{value}' is not a number ({field}{agent_type})")
+                        continue
+                    if field == "tco_maint_pct_":
+                        if formats[field].rstrip().endswith("%"):
+                            number *= 100.0  # Excel stores 20% as 0.2
+                        elif 0 < number < 1:
+                            row_errors.append(f"{ws.title} row {row_no}: {number:g} looks like a fraction; enter "
+                                              f"{number * 100:g} or format the cell as % ({field}{agent_type})")
+                            continue
+                    if number < 0 or (field == "tco_maint_pct_" and number > 100):
+                        row_errors.append(f"{ws.title} row {row_no}: {number:g} out of range ({field}{agent_type})")
+                        continue
+                    row_values[f"{field}{agent_type}"] = number
+                name = ws.title if cells.get("variant") in (None, "") else f"{ws.title}/{cells['variant']}"
+                if (name, agent_type) in seen:
+                    row_errors.append(f"{ws.title} row {row_no}: duplicate {agent_type} row for variant '{name}' "
+                                      f"(first at {seen[(name, agent_type)]})")
+                if row_errors:
+                    errors.extend(row_errors)  # a row with any invalid value is rejected as a whole
+                    continue
+                seen[(name, agent_type)] = f"{ws.title} row {row_no}"
+                variants.setdefault(name, {}).update(row_values)
+            if columns is None or "agent_type" not in columns.values():
+                skipped.append(ws.title)
+    finally:
+        wb.close()
+    return {k: v for k, v in variants.items() if v}, errors, skipped
+
+def _unique_scenario_name(name, scenarios):
+    candidate, n = name, 2
+    while candidate in scenarios:
+        candidate, n = f"{name} ({n})", n + 1
+    return candidate
+
+def _add_current_scenario():
+    """Button callback: store the session as a scenario and suggest the next free name."""
+    scenarios = st.session_state["cmp_scenarios"]
+    requested = st.session_state["cmp_new_name"].strip() or "Scenario"
+    name = _unique_scenario_name(requested, scenarios)
+    scenarios[name] = scenario_inputs(current_scenario_values())
+    st.session_state["cmp_added_msg"] = f"Added '{name}'." if name == requested else f"'{requested}' already exists; added as '{name}'."
+    st.session_state["cmp_new_name"] = _unique_scenario_name(f"Scenario {len(scenarios) + 1}", scenarios)
+
+def _load_picked_scenario():
+    name = st.session_state.get("cmp_load_pick")
+    scenario = st.session_state["cmp_scenarios"].get(name)
+    if scenario is not None:
+        load_scenario_into_session(scenario)
+        st.session_state["cmp_loaded_msg"] = f"'{name}' loaded into the TCO and Simulation inputs (Undo reverts it)."
+
+def _add_scenarios(scenarios, new, source):
+    """Store imported scenarios; a re-import of a changed file replaces its scenarios, with a notice."""
+    replaced = [name for name in new if name in scenarios]
+    scenarios.update(new)
+    st.success(f"Loaded {len(new)} scenario(s) from '{source}'.")
+    if replaced:
+        st.warning(f"Replaced {len(replaced)} existing scenario(s): {', '.join(replaced[:10])}" + (", ..." if len(replaced) > 10 else ""))
+
+def compare_page():
+    st.header("Compare — Scenarios side by side")
+    st.markdown("Load TCO/Simulation scenarios (JSON profiles or the current session), evaluate them in one batch and diff every input and output against a baseline.")
+    if "cmp_scenarios" not in st.session_state:
+        st.session_state["cmp_scenarios"] = {}
+    if "cmp_import_hashes" not in st.session_state:
+        st.session_state["cmp_import_hashes"] = {}
+    scenarios = st.session_state["cmp_scenarios"]
+
+    with st.expander("Add scenarios ▾", expanded=not scenarios):
+        c1, c2 = st.columns(2)
+        with c1:
+            if "cmp_new_name" not in st.session_state:
+                st.session_state["cmp_new_name"] = _unique_scenario_name("Scenario 1", scenarios)
+            st.text_input("Scenario name", key="cmp_new_name")
+            st.button("Add current session as scenario", key="cmp_add_current", on_click=_add_current_scenario)
+            if "cmp_added_msg" in st.session_state:
+                st.success(st.session_state.pop("cmp_added_msg"))
+        with c2:
+            uploads = st.file_uploader("Upload scenario JSON (a single profile, or a mapping of name -> profile)",
+                                       type=["json"], accept_multiple_files=True, key="cmp_uploads")
+            for up in uploads or []:
+                digest = hashlib.sha256(up.getvalue()).hexdigest()
+                if digest in st.session_state["cmp_import_hashes"]:
+                    continue
+                try:
+                    loaded = json.load(up)
+                    if not isinstance(loaded, dict):
+                        raise ValueError("expected a JSON object")
+                except Exception as e:
+                    st.error(f"Failed to load {up.name}: {e}")
+                    continue
+                st.session_state["cmp_import_hashes"][digest] = up.name
+                base_name = up.name.rsplit(".", 1)[0]
+                if loaded and all(isinstance(v, dict) for v in loaded.values()):
+                    profiles = {f"{base_name}/{name}": scenario_inputs(profile) for name, profile in loaded.items()}
+                else:
+                    profiles = {base_name: scenario_inputs(loaded)}
+                _add_scenarios(scenarios, profiles, up.name)
+        st.markdown("**Import rate cards from Excel** — one scenario per sheet (or per value of a Variant column), "
+                    "columns: Agent Type, Build Hours, Hourly Rate, Maintenance %, Human Rate. "
+                    "Values not in the workbook are taken from the current session.")
+        workbook = st.file_uploader("Rate-card workbook (.xlsx)", type=["xlsx"], key="cmp_rate_cards")
+        if workbook is not None:
+            data = workbook.getvalue()
+            digest = hashlib.sha256(data).hexdigest()
+            if digest in st.session_state["cmp_import_hashes"]:
+                st.caption(f"'{workbook.name}' is unchanged since it was imported; skipped.")
+            else:
+                try:
+                    variants, errors, skipped = read_rate_cards(data)
+                except ImportError:
+                    st.info("Install openpyxl to enable .xlsx import.")
+                except Exception as e:
+                    st.error(f"Failed to read workbook: {e}")
+                else:
+                    base = current_scenario_values()
+                    book = workbook.name.rsplit(".", 1)[0]
+                    _add_scenarios(scenarios, {f"{book}/{name}": scenario_inputs({**base, **overrides})
+                                               for name, overrides in variants.items()}, workbook.name)
+                    st.session_state["cmp_import_hashes"][digest] = workbook.name
+                    if skipped:
+                        st.warning(f"Skipped sheets without an Agent Type column: {', '.join(skipped)}")
+                    if errors:
+                        st.warning(f"{len(errors)} invalid value(s); those rows were not imported:\n\n" + "\n".join(f"- {e}" for e in errors[:20]) +
+                                   ("\n- ..." if len(errors) > 20 else ""))
+        if scenarios:
+            c1, c2 = st.columns([3, 1])
+            c1.selectbox("Scenario to load into the TCO/Simulation inputs", list(scenarios), key="cmp_load_pick")
+            c2.button("Load scenario into session", key="cmp_load_btn", on_click=_load_picked_scenario)
+            if "cmp_loaded_msg" in st.session_state:
+                st.success(st.session_state.pop("cmp_loaded_msg"))
+            to_remove = st.multiselect("Remove scenarios", list(scenarios), key="cmp_remove")
+            if st.button("Remove selected", key="cmp_remove_btn") and to_remove:
+                for name in to_remove:
+                    scenarios.pop(name, None)
+
+    if not scenarios:
+        st.info("No scenarios loaded yet. Add the current session or upload JSON profiles exported from the TCO page.")
+        return
+
+    # Columnar inputs -> one vectorised evaluation for all scenarios
+    names = list(scenarios)
+    inputs_df = pd.DataFrame.from_records([scenarios[n] for n in names], index=names, columns=list(SCENARIO_DEFAULTS))
+    outputs_df = pd.DataFrame(simulate_batch(inputs_df), index=names)
+    table = pd.concat([inputs_df, outputs_df], axis=1)
+    table.index.name = "Scenario"
+
+    c1, c2, c3 = st.columns([2, 1, 1])
+    baseline = c1.selectbox("Baseline scenario", names, key="cmp_baseline")
+    only_changed = c2.checkbox("Only columns that differ", value=True, key="cmp_only_changed")
+    show_deltas = c3.checkbox("Show deltas instead of values", value=False, key="cmp_show_deltas")
+
+    deltas = table - table.loc[baseline]
+    if only_changed:
+        changed = (deltas != 0).any(axis=0).to_numpy()
+        table, deltas = table.loc[:, changed], deltas.loc[:, changed]
+    st.caption(f"{len(names)} scenarios × {table.shape[1]} columns "
+               f"({int(np.isin(table.columns, outputs_df.columns).sum())} outputs). Highlighted cells differ from '{baseline}'.")
+
+    if table.shape[1] == 0:
+        st.info("All scenarios are identical to the baseline.")
+    else:
+        # pandas Styler renders cell by cell, so large comparisons are styled one page of rows at a time
+        rows_per_page = max(1, COMPARE_STYLE_MAX_CELLS // table.shape[1])
+        pages = math.ceil(len(table) / rows_per_page)
+        page = 1
+        if pages > 1:
+            page = int(st.number_input(f"Page (of {pages}, {rows_per_page} scenarios each)", min_value=1, max_value=pages,
+                                       value=1, step=1, key="cmp_page", format="%d"))
+        rows = slice((page - 1) * rows_per_page, page * rows_per_page)
+        page_table, page_deltas = table.iloc[rows], deltas.iloc[rows]
+        shown = page_deltas if show_deltas else page_table
+        styled = shown.style.apply(lambda _: _style_deltas(page_table, page_deltas, outputs_df.columns), axis=None).format(precision=2)
+        st.dataframe(styled, use_container_width=True)
+
+    st.download_button("Download comparison CSV", pd.concat([inputs_df, outputs_df], axis=1).to_csv().encode("utf-8"),
+                       file_name="scenario_comparison.csv", mime="text/csv")
+
+# -----------------------
+# Pareto Explorer page (cost vs headcount vs margin)
+# -----------------------
+PARETO_CHUNK = 250000  # candidates evaluated per batch; only each batch's frontier is kept
+PARETO_PICK_MAX = 2000  # frontier points offered in the picker (cheapest first)
+OBJECTIVES = ["total_direct_costs_ann", "human_headcount_required", "true_gop_pct"]
+
+def _collapse_objectives(front):
+    """Keep one configuration per distinct (cost, headcount, GOP) point, summing "configs"."""
+    grouped = front.groupby(OBJECTIVES, sort=False)
+    first = grouped.head(1).copy()
+    first["configs"] = grouped["configs"].sum().to_numpy()
+    return first
+
+def explore_pareto(base, space, n_candidates, seed):
+    """Sample Simulation configurations around `base`, evaluate them in chunks and return the frontier.
+
+    `space` holds (low, high) integer ranges for "count_<type>", "ratio", "cm", "trio" and "inloop".
+    Objectives: minimise total_direct_costs_ann and human_headcount_required, maximise true_gop_pct.
+    The frontier of the union of chunk frontiers equals the frontier of all candidates. Configurations
+    with identical objective values collapse to one point; "configs" counts how many share it.
+    """
+    rng = np.random.default_rng(seed)
+    fronts = []
+    for start in range(0, n_candidates, PARETO_CHUNK):
+        size = min(PARETO_CHUNK, n_candidates - start)
+        params = {}
+        for t in AGENT_TYPES:
+            lo, hi = space[f"count_{t.lower()}"]
+            params[f"sim_count_{t.lower()}"] = rng.integers(lo, hi + 1, size)
+        params["sim_agent_ratio_pct"] = rng.integers(space["ratio"][0], space["ratio"][1] + 1, size)
+        params["sim_agent_cm_pct"] = rng.integers(space["cm"][0], space["cm"][1] + 1, size)
+        params["sim_agent_trio_pct"] = rng.integers(space["trio"][0], space["trio"][1] + 1, size)
+        params["sim_human_inloop_pct_percent"] = rng.integers(space["inloop"][0], space["inloop"][1] + 1, size)
+        params["sim_human_inloop_pct_global"] = params["sim_human_inloop_pct_percent"] / 100.0
+        out = simulate_batch({**base, **params})
+        keep = pareto_front_mask(out["human_headcount_required"], out["total_direct_costs_ann"], -out["true_gop_pct"])
+        chunk = pd.DataFrame({k: v[keep] for k, v in params.items() if k != "sim_human_inloop_pct_global"})
+        chunk["configs"] = 1
+        for k in ("total_direct_costs_ann", "human_headcount_required", "true_gop_pct", "agent_headcount", "total_revenue_ann"):
+            chunk[k] = out[k][keep]
+        fronts.append(_collapse_objectives(chunk))
+    front = pd.concat(fronts, ignore_index=True)
+    front = front[pareto_front_mask(front["human_headcount_required"], front["total_direct_costs_ann"], -front["true_gop_pct"])]
+    front = _collapse_objectives(front).sort_values(OBJECTIVES[:2]).reset_index(drop=True)
+    front.index.name = "Point"
+    return front
+
+def pareto_page():
+    st.header("Pareto Explorer — Cost vs Headcount vs Margin")
+    st.markdown("Generate candidate Simulation configurations, evaluate them in one batch and keep only the non-dominated ones "
+                "(lower total direct cost, fewer humans, higher true GOP %). Inputs not varied here come from the current session.")
+
+    with st.expander("Candidate space ▾", expanded=True):
+        cols = st.columns(4)
+        space = {}
+        for i, t in enumerate(AGENT_TYPES):
+            lower = t.lower()
+            max_count = cols[i].number_input(f"Max {t} agents", min_value=0, value=10, step=1, key=f"pf_max_{lower}", format="%d")
+            space[f"count_{lower}"] = (0, int(max_count))
+        c1, c2 = st.columns(2)
+        space["ratio"] = c1.slider("Agent Ratio % range", 0, 100, (0, 100), key="pf_ratio")
+        space["inloop"] = c1.slider("Human in-loop % range", 0, 100, (0, 30), key="pf_inloop")
+        space["cm"] = c2.slider("Agent CM % range", 0, 100, (20, 60), key="pf_cm")
+        space["trio"] = c2.slider("Agent Trio % range", 0, 100, (0, 10), key="pf_trio")
+        c1, c2 = st.columns(2)
+        n_candidates = c1.number_input("Candidates to sample", min_value=1000, max_value=5000000, value=200000,
+                                       step=50000, key="pf_candidates", format="%d")
+        seed = c2.number_input("Random seed", min_value=0, value=0, step=1, key="pf_seed", format="%d")
+
+    if st.button("Generate frontier", key="pf_run"):
+        base = scenario_inputs(current_scenario_values())
+        with st.spinner(f"Evaluating {int(n_candidates):,} candidates..."):
+            st.session_state["pf_front"] = explore_pareto(base, space, int(n_candidates), int(seed))
+        st.session_state["pf_evaluated"] = int(n_candidates)
+
+    front = st.session_state.get("pf_front")
+    if front is None:
+        st.info("Set the candidate space and press Generate frontier.")
+        return
+    st.markdown(f"**{len(front):,} non-dominated configurations** out of {st.session_state['pf_evaluated']:,} candidates.")
+
+    if len(front) > PARETO_PICK_MAX:
+        st.caption(f"The picker lists the {PARETO_PICK_MAX:,} cheapest points; download the CSV below for the full frontier.")
+    point = st.selectbox("Pick a point", list(front.index[:PARETO_PICK_MAX]), key="pf_point",
+                         format_func=lambda i: (f"#{i}: {currency(front.at[i, 'total_direct_costs_ann'])}, "
+                                                f"{int(front.at[i, 'human_headcount_required'])} humans, "
+                                                f"GOP {front.at[i, 'true_gop_pct']:.2f}%"
+                                                + (f" ({int(front.at[i, 'configs'])} configs)" if front.at[i, "configs"] > 1 else "")))
+    chart_df = front.reset_index()
+    base_chart = alt.Chart(chart_df).encode(
+        x=alt.X("total_direct_costs_ann:Q", title="Total direct cost (SEK/yr)"),
+        y=alt.Y("true_gop_pct:Q", title="True GOP %"),
+    )
+    points = base_chart.mark_circle(size=70).encode(
+        color=alt.Color("human_headcount_required:O", title="Human headcount"),
+        tooltip=["Point", "total_direct_costs_ann", "human_headcount_required", "true_gop_pct", "agent_headcount"]
+                + [f"sim_count_{t.lower()}" for t in AGENT_TYPES],
+    )
+    selected = alt.Chart(chart_df[chart_df["Point"] == point]).mark_point(size=300, color="#d62728", strokeWidth=3).encode(
+        x="total_direct_costs_ann:Q", y="true_gop_pct:Q")
+    st.altair_chart((points + selected).interactive(), use_container_width=True)
+
+    row = front.loc[point]
+    st.dataframe(front.loc[[point]], use_container_width=True)
+    if st.button("Load this point into Simulation", key="pf_load"):
+        for t in AGENT_TYPES:
+            st.session_state[f"sim_count_{t.lower()}"] = int(row[f"sim_count_{t.lower()}"])
+        st.session_state["sim_agent_ratio_pct"] = int(row["sim_agent_ratio_pct"])
+        st.session_state["sim_agent_cm_pct"] = int(row["sim_agent_cm_pct"])
+        st.session_state["sim_agent_trio_pct"] = int(row["sim_agent_trio_pct"])
+        st.session_state["sim_human_inloop_pct_percent"] = int(row["sim_human_inloop_pct_percent"])
+        st.session_state["sim_human_inloop_pct_global"] = int(row["sim_human_inloop_pct_percent"]) / 100.0
+        st.success(f"Point #{point} loaded. Open the Simulation page to review it.")
+
+    with st.expander("All frontier points ▾", expanded=False):
+        st.dataframe(front, use_container_width=True)
+        st.download_button("Download frontier CSV", front.to_csv().encode("utf-8"), file_name="pareto_frontier.csv", mime="text/csv")
+
 # -----------------------
 # Home page with Agent Types quick reference
 # -----------------------
@@ -749,6 +1327,140 @@ def home_page():
     ]
     st.table(pd.DataFrame(quick_ref))
 
+# -----------------------
+# Scenario history (undo / redo / named checkpoints)
+# -----------------------
+# History is delta-encoded: each step stores only the (key, old, new) triples that changed, and
+# checkpoints store only the keys that differ from SCENARIO_DEFAULTS. "hist_last" is the single full
+# copy of the tracked state, used to detect changes. None marks a key that was absent.
+HISTORY_MAX_STEPS = 200
+HISTORY_MAX_CHECKPOINTS = 20
+
+def _tracked_state():
+    return {k: v for k, v in current_scenario_values().items() if isinstance(v, (int, float, str, bool))}
+
+def _history_init():
+    if "hist_last" not in st.session_state:
+        st.session_state["hist_last"] = _tracked_state()
+        st.session_state["hist_undo"] = deque(maxlen=HISTORY_MAX_STEPS)
+        st.session_state["hist_redo"] = deque(maxlen=HISTORY_MAX_STEPS)
+        st.session_state["hist_checkpoints"] = {}
+        st.session_state["hist_absent"] = set()
+
+def _history_apply(delta, side):
+    """Write the old (side=1) or new (side=2) values of a delta into session state."""
+    last = st.session_state["hist_last"]
+    for entry in delta:
+        k, value = entry[0], entry[side]
+        if value is None:
+            st.session_state.pop(k, None)
+            last.pop(k, None)
+        else:
+            st.session_state[k] = value
+            last[k] = value
+
+def _history_push(delta):
+    st.session_state["hist_undo"].append(delta)
+    st.session_state["hist_redo"].clear()
+
+def record_history(merge=False):
+    """Diff tracked tco_/sim_ keys against the last seen state and push one undo step if anything changed.
+
+    Called before and after the page runs. With merge=True, values the page itself wrote (derived
+    keys, profile loads) join the step recorded at the start of the same run. Returns True if a step was pushed.
+    """
+    _history_init()
+    last = st.session_state["hist_last"]
+    # keys that disappear (widgets not rendered on this page) are not edits; only compare present keys
+    current = _tracked_state()
+    absent = st.session_state["hist_absent"]
+    for k, v in current.items():
+        if (k not in last or k in absent) and k in SCENARIO_DEFAULTS and SCENARIO_DEFAULTS[k] == v:
+            last[k] = v  # a key seeded (or re-seeded after being dropped) with its default is not an edit
+    st.session_state["hist_absent"] = {k for k in last if k not in current}
+    delta = tuple((k, last.get(k), v) for k, v in current.items() if last.get(k) != v)
+    if not delta:
+        return False
+    last.update((k, v) for k, _, v in delta)
+    undo = st.session_state["hist_undo"]
+    if merge and undo:
+        merged = {entry[0]: entry for entry in undo.pop()}
+        for k, old, new in delta:
+            merged[k] = (k, merged[k][1] if k in merged else old, new)
+        delta = tuple(merged.values())
+    _history_push(delta)
+    return True
+
+def undo_history():
+    if st.session_state["hist_undo"]:
+        delta = st.session_state["hist_undo"].pop()
+        _history_apply(delta, 1)
+        st.session_state["hist_redo"].append(delta)
+
+def redo_history():
+    if st.session_state["hist_redo"]:
+        delta = st.session_state["hist_redo"].pop()
+        _history_apply(delta, 2)
+        st.session_state["hist_undo"].append(delta)
+
+def set_history_limit():
+    n = int(st.session_state["hist_max_steps"])
+    st.session_state["hist_undo"] = deque(st.session_state["hist_undo"], maxlen=n)
+    st.session_state["hist_redo"] = deque(st.session_state["hist_redo"], maxlen=n)
+
+def save_checkpoint(name=None):
+    _history_init()
+    checkpoints = st.session_state["hist_checkpoints"]
+    name = (name or "").strip() or f"Checkpoint {len(checkpoints) + 1}"
+    checkpoints.pop(name, None)
+    checkpoints[name] = {k: v for k, v in _tracked_state().items() if SCENARIO_DEFAULTS.get(k) != v}
+    while len(checkpoints) > HISTORY_MAX_CHECKPOINTS:
+        checkpoints.pop(next(iter(checkpoints)))  # evict the oldest
+
+def _save_checkpoint_clicked():
+    save_checkpoint(st.session_state.get("hist_cp_name"))
+    st.session_state["hist_cp_name"] = ""
+
+def apply_as_history_step(values):
+    """Write values into session state as one undoable step; call from a widget callback."""
+    _history_init()
+    current = _tracked_state()
+    delta = tuple((k, current.get(k), v) for k, v in values.items() if current.get(k) != v)
+    if delta:
+        _history_apply(delta, 2)
+        _history_push(delta)
+
+def restore_checkpoint():
+    """Restore the picked checkpoint as one undoable step."""
+    sparse = st.session_state["hist_checkpoints"].get(st.session_state.get("hist_cp_pick"))
+    if sparse is None:
+        return
+    current = _tracked_state()
+    target = {k: sparse.get(k, SCENARIO_DEFAULTS.get(k)) for k in set(current) | set(sparse)}
+    apply_as_history_step({k: v for k, v in target.items() if v is not None})
+
+def delete_checkpoint():
+    st.session_state["hist_checkpoints"].pop(st.session_state.get("hist_cp_pick"), None)
+
+def history_sidebar():
+    undo, redo = st.session_state["hist_undo"], st.session_state["hist_redo"]
+    st.sidebar.markdown("---")
+    st.sidebar.subheader("History")
+    c1, c2 = st.sidebar.columns(2)
+    c1.button(f"Undo ({len(undo)})", key="hist_undo_btn", on_click=undo_history, disabled=not undo)
+    c2.button(f"Redo ({len(redo)})", key="hist_redo_btn", on_click=redo_history, disabled=not redo)
+    with st.sidebar.expander("Checkpoints ▾", expanded=False):
+        st.text_input("Checkpoint name", key="hist_cp_name")
+        st.button("Save checkpoint", key="hist_cp_save", on_click=_save_checkpoint_clicked)
+        checkpoints = st.session_state["hist_checkpoints"]
+        if checkpoints:
+            st.selectbox("Saved checkpoints", list(checkpoints)[::-1], key="hist_cp_pick")
+            c1, c2 = st.columns(2)
+            c1.button("Restore", key="hist_cp_restore", on_click=restore_checkpoint)
+            c2.button("Delete", key="hist_cp_delete", on_click=delete_checkpoint)
+        st.number_input("Undo steps kept", min_value=10, max_value=5000, value=HISTORY_MAX_STEPS, step=10,
+                        key="hist_max_steps", on_change=set_history_limit, format="%d")
+
 # -----------------------
 # Router
 # -----------------------
@@ -758,11 +1470,16 @@ PAGES = {
     "Simulation": simulation_page,
     "Agent Efficiency": agent_efficiency_page,
     "Commercial Models": models_page,
+    "Compare": compare_page,
+    "Pareto Explorer": pareto_page,
 }
 
 st.sidebar.title("Navigation")
 choice = st.sidebar.radio("Choose page", list(PAGES.keys()))
+pushed = record_history()
 PAGES[choice]()
+record_history(merge=pushed)
+history_sidebar()
 
 # Footer
 st.sidebar.markdown("---")
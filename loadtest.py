@@ -0,0 +1,226 @@
+# loadtest.py
+# Local concurrent-session load test for app.py (no server, no external services).
+#
+# Each simulated session drives its own copy of the app through Streamlit's
+# in-process AppTest runner: it walks the sidebar PAGES and makes widget edits
+# (number inputs and sliders on the current page), timing every rerun.
+# AppTest swaps process-global runtime state while a script runs, so sessions
+# cannot share one interpreter; every session gets its own worker process and
+# all sessions start together behind a barrier. By default workers spread over
+# all cores, so until N exceeds the core count the curve is an upper bound for
+# a single hosted server process; --one-cpu pins every worker to one core to
+# approximate sessions sharing one interpreter (Linux only).
+#
+# Usage:
+#   python loadtest.py                          # N = 1, 2, 4, 8
+#   python loadtest.py --sessions 1 4 16 --reruns 40 --csv scaling.csv
+#   python loadtest.py --one-cpu                # all sessions share one core
+import argparse
+import csv
+import math
+import multiprocessing as mp
+import os
+import queue
+import random
+import resource
+import statistics
+import sys
+import threading
+import time
+
+DEFAULT_APP = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+PAGE_SWITCH_PROB = 0.2  # share of reruns that are page navigations instead of edits
+STARTUP_TIMEOUT = 120.0  # seconds all sessions may take to reach the start barrier
+
+
+def _rss_mb():
+    """Current resident set size; falls back to the peak where /proc is unavailable."""
+    try:
+        with open("/proc/self/statm") as fh:
+            return int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024.0 * 1024.0)
+    except (OSError, ValueError, IndexError):
+        # ru_maxrss is KiB on Linux and bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024.0 * 1024.0) if sys.platform == "darwin" else peak / 1024.0
+
+
+def _perturb(widget, rng):
+    """Return a realistic new value for a number_input / slider (+/-25%, clamped)."""
+    current = widget.value
+    if current is None or isinstance(current, (list, tuple)):
+        return None
+    lo = widget.min if widget.min is not None else 0
+    hi = widget.max if widget.max is not None else max(abs(current) * 2, 1)
+    spread = max(abs(current) * 0.25, widget.step or 1)
+    new = min(hi, max(lo, current + rng.uniform(-spread, spread)))
+    if isinstance(current, int) and not isinstance(current, bool):
+        new = int(round(new))
+    return new
+
+
+def _session_worker(app_path, session_id, reruns, seed, timeout, cpu, barrier, results):
+    try:
+        if cpu is not None:
+            os.sched_setaffinity(0, {cpu})
+        from streamlit import logger
+        from streamlit.testing.v1 import AppTest
+
+        rng = random.Random(seed * 1000 + session_id)
+        # A throwaway session walks every page first so the app's imports and one-time setup are
+        # paid before the baseline; it is kept alive so the measured session's memory is additive.
+        warm = AppTest.from_file(app_path, default_timeout=timeout)
+        warm.run()
+        logger.set_log_level("error")  # after the first run, which applies the default log config
+        pages = list(warm.sidebar.radio[0].options)
+        for page in pages:
+            warm.sidebar.radio[0].set_value(page).run()
+        base_mb = _rss_mb()
+        at = AppTest.from_file(app_path, default_timeout=timeout)
+        at.run()  # first render of the measured session is not timed
+    except Exception as e:
+        barrier.abort()  # release sessions already waiting at the barrier
+        results.put({"session": session_id, "error": f"{type(e).__name__}: {e}"})
+        return
+    latencies = []
+    errors = 0
+
+    try:
+        barrier.wait(timeout=STARTUP_TIMEOUT)
+    except threading.BrokenBarrierError:
+        results.put({"session": session_id, "error": "start barrier broken (another session failed to start)"})
+        return
+    start = time.perf_counter()
+    for _ in range(reruns):
+        widgets = list(at.main.number_input) + list(at.main.slider)
+        target = None
+        if widgets and rng.random() >= PAGE_SWITCH_PROB:
+            widget = rng.choice(widgets)
+            new_value = _perturb(widget, rng)
+            if new_value is not None:
+                target = widget.set_value(new_value)
+        if target is None:
+            target = at.sidebar.radio[0].set_value(rng.choice(pages))
+        t0 = time.perf_counter()
+        try:
+            target.run()
+        except Exception:
+            errors += 1
+        latencies.append(time.perf_counter() - t0)
+        errors += len(at.exception)
+    elapsed = time.perf_counter() - start
+
+    results.put({
+        "session": session_id,
+        "latencies": latencies,
+        "elapsed": elapsed,
+        "errors": errors,
+        "mem_mb": max(0.0, _rss_mb() - base_mb),
+    })
+
+
+def _collect(procs, results):
+    """Gather one result per worker; fail fast if a worker dies without reporting."""
+    collected = []
+    while len(collected) < len(procs):
+        try:
+            collected.append(results.get(timeout=1.0))
+            continue
+        except queue.Empty:
+            pass
+        dead = [p for p in procs if p.exitcode is not None and p.exitcode != 0]
+        if dead or all(p.exitcode is not None for p in procs):
+            try:  # a result may have landed while we checked
+                collected.append(results.get(timeout=1.0))
+                continue
+            except queue.Empty:
+                codes = ", ".join(f"{p.name}={p.exitcode}" for p in procs)
+                raise RuntimeError(f"session worker exited without a result ({codes})")
+    return collected
+
+
+def run_level(app_path, sessions, reruns, seed, timeout, cpu=None):
+    """Run `sessions` concurrent sessions once and return aggregated metrics."""
+    ctx = mp.get_context("spawn")
+    barrier = ctx.Barrier(sessions)
+    results = ctx.Queue()
+    procs = [ctx.Process(target=_session_worker,
+                         args=(app_path, i, reruns, seed, timeout, cpu, barrier, results))
+             for i in range(sessions)]
+    for p in procs:
+        p.start()
+    try:
+        collected = _collect(procs, results)
+    finally:
+        for p in procs:
+            p.join(timeout=5.0)
+            if p.is_alive():
+                p.terminate()
+    failures = [r for r in collected if "error" in r]
+    if failures:
+        raise RuntimeError("; ".join(f"session {r['session']}: {r['error']}" for r in failures))
+
+    latencies = [lat for r in collected for lat in r["latencies"]]
+    wall = max(r["elapsed"] for r in collected)
+    return {
+        "sessions": sessions,
+        "reruns": len(latencies),
+        "wall_s": wall,
+        "throughput_rps": len(latencies) / wall if wall > 0 else 0.0,
+        "p50_ms": statistics.median(latencies) * 1000.0,
+        "p95_ms": statistics.quantiles(latencies, n=100, method="inclusive")[94] * 1000.0
+                  if len(latencies) > 1 else latencies[0] * 1000.0,
+        "mem_mb_per_session": statistics.mean(r["mem_mb"] for r in collected),
+        "errors": sum(r["errors"] for r in collected),
+    }
+
+
+def print_table(rows):
+    header = f"{'N':>4} {'reruns':>7} {'wall s':>8} {'rerun/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'MB/sess':>8} {'errors':>6}  p95 curve"
+    print(header)
+    print("-" * len(header))
+    worst = max(r["p95_ms"] for r in rows) or 1.0
+    for r in rows:
+        bar = "#" * max(1, int(math.ceil(30 * r["p95_ms"] / worst)))
+        print(f"{r['sessions']:>4} {r['reruns']:>7} {r['wall_s']:>8.2f} {r['throughput_rps']:>8.2f} "
+              f"{r['p50_ms']:>8.1f} {r['p95_ms']:>8.1f} {r['mem_mb_per_session']:>8.1f} {r['errors']:>6}  {bar}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Concurrent-session load test for the Agent Pricing Factory app.")
+    parser.add_argument("--app", default=DEFAULT_APP, help="Streamlit script to load (default: app.py)")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 2, 4, 8],
+                        help="Concurrent session counts to sweep (default: 1 2 4 8)")
+    parser.add_argument("--reruns", type=int, default=20, help="Timed reruns per session (default: 20)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for widget edits")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Per-rerun timeout in seconds")
+    parser.add_argument("--csv", help="Also write the scaling curve to this CSV file")
+    parser.add_argument("--one-cpu", action="store_true",
+                        help="Pin all sessions to one CPU, like a single server process (Linux only)")
+    args = parser.parse_args(argv)
+
+    cpu = None
+    if args.one_cpu:
+        if not hasattr(os, "sched_setaffinity"):
+            parser.error("--one-cpu needs os.sched_setaffinity (Linux)")
+        cpu = min(os.sched_getaffinity(0))
+
+    rows = []
+    for n in args.sessions:
+        print(f"Running {n} concurrent session(s) x {args.reruns} reruns ...", flush=True)
+        try:
+            rows.append(run_level(args.app, n, args.reruns, args.seed, args.timeout, cpu))
+        except RuntimeError as e:
+            sys.exit(f"Load test aborted at N={n}: {e}")
+    print()
+    print_table(rows)
+
+    if args.csv:
+        with open(args.csv, "w", newline="") as fh:
+            writer = csv.DictWriter(fh, fieldnames=list(rows[0].keys()))
+            writer.writeheader()
+            writer.writerows(rows)
+        print(f"\nScaling curve written to {args.csv}")
+
+
+if __name__ == "__main__":
+    main()
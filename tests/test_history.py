@@ -0,0 +1,77 @@
+"""Undo / redo / checkpoint round-trips, driven through Streamlit's AppTest runner."""
+import os
+
+from streamlit.testing.v1 import AppTest
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+
+
+def _app():
+    at = AppTest.from_file(APP, default_timeout=60)
+    at.run()
+    return at
+
+
+def _goto(at, page):
+    at.sidebar.radio[0].set_value(page).run()
+
+
+def _button(at, key):
+    return next(b for b in at.sidebar.button if b.key == key)
+
+
+def _undo_count(at):
+    return len(at.session_state["hist_undo"])
+
+
+def test_restore_checkpoint_then_undo_round_trip():
+    at = _app()
+    _button(at, "hist_cp_save").click().run()  # checkpoint on Home, all defaults
+
+    _goto(at, "Simulation")
+    at.slider(key="sim_human_inloop_pct_percent").set_value(40).run()
+    at.number_input(key="sim_count_utility").set_value(4).run()
+    assert at.session_state["sim_human_inloop_pct_global"] == 0.4
+
+    at.selectbox(key="hist_cp_pick").set_value("Checkpoint 1")
+    _button(at, "hist_cp_restore").click().run()
+    assert at.slider(key="sim_human_inloop_pct_percent").value == 0
+    assert at.number_input(key="sim_count_utility").value == 0
+    assert at.session_state["sim_human_inloop_pct_global"] == 0.0
+
+    undo_before = _undo_count(at)
+    _button(at, "hist_undo_btn").click().run()
+    assert at.slider(key="sim_human_inloop_pct_percent").value == 40
+    assert at.number_input(key="sim_count_utility").value == 4
+    assert at.session_state["sim_human_inloop_pct_global"] == 0.4
+    assert _undo_count(at) == undo_before - 1  # the undo was not re-recorded as a new edit
+
+    _button(at, "hist_redo_btn").click().run()
+    assert at.slider(key="sim_human_inloop_pct_percent").value == 0
+    assert at.number_input(key="sim_count_utility").value == 0
+    assert not at.exception
+
+
+def test_undo_pareto_load_restores_inloop_and_keeps_redo():
+    at = _app()
+    _goto(at, "Simulation")
+    at.slider(key="sim_human_inloop_pct_percent").set_value(8).run()
+
+    _goto(at, "Pareto Explorer")
+    at.number_input(key="pf_candidates").set_value(1000)
+    at.slider(key="pf_inloop").set_value((20, 30))
+    at.button(key="pf_run").click().run()
+    at.button(key="pf_load").click().run()
+    loaded = at.session_state["sim_human_inloop_pct_percent"]
+    assert 20 <= loaded <= 30
+
+    _button(at, "hist_undo_btn").click().run()
+    assert at.session_state["sim_human_inloop_pct_percent"] == 8
+    assert at.session_state["sim_human_inloop_pct_global"] == 0.08
+    assert len(at.session_state["hist_redo"]) == 1
+
+    _goto(at, "Simulation")  # navigating is not an edit, so redo survives
+    assert at.slider(key="sim_human_inloop_pct_percent").value == 8
+    assert len(at.session_state["hist_redo"]) == 1
+    assert not at.exception
+